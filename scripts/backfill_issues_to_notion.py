@@ -3,6 +3,8 @@
 Backfill all existing GitHub issues to Notion.
 Run this once to sync all existing issues, then the workflows handle ongoing sync.
 
+The Notion database must have a "Last Synced" date property (see README).
+
 Usage:
     export NOTION_API_KEY="your-key"
     export NOTION_DATABASE_ID="your-db-id"
@@ -11,18 +13,18 @@ Usage:
     python scripts/backfill_issues_to_notion.py
 """
 
+import asyncio
 import os
 import sys
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import requests
+from scripts.github_graphql import fetch_issues
+from scripts.http_client import close_session
+from scripts.notion_diff import is_unchanged
 from scripts.sync_issue_to_notion import (
-    GITHUB_API_BASE,
-    get_github_headers,
-    get_issue_comments,
-    find_existing_page,
+    load_repo_index,
     create_notion_page,
     update_notion_page,
     GITHUB_TOKEN,
@@ -30,45 +32,65 @@ from scripts.sync_issue_to_notion import (
 )
 
 
-def get_all_issues(owner: str, repo: str) -> list:
-    """Fetch all issues (open and closed) from GitHub."""
+# Max issues processed concurrently
+ISSUE_CONCURRENCY = 8
+
+
+async def get_all_issues(owner: str, repo: str) -> list:
+    """Fetch all issues (open and closed) from GitHub, with comments, via GraphQL."""
     all_issues = []
     page = 1
-    per_page = 100
+    cursor = None
+
+    # GraphQL returns 100 issues per request with labels, assignees,
+    # milestone and comments included (and never includes pull requests).
+    while True:
+        try:
+            issues, cursor = await fetch_issues(owner, repo, cursor)
+        except Exception as e:
+            print(f"Error fetching issues: {e}")
+            break
 
-    for state in ["open", "closed"]:
-        page = 1
-        while True:
-            url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues"
-            params = {
-                "state": state,
-                "per_page": per_page,
-                "page": page,
-            }
-            resp = requests.get(url, headers=get_github_headers(), params=params)
+        all_issues.extend(issues)
+        print(f"Fetched page {page} of issues ({len(issues)} issues)")
 
-            if resp.status_code != 200:
-                print(f"Error fetching issues: {resp.status_code}")
-                break
+        if not cursor:
+            break
+        page += 1
 
-            issues = resp.json()
-            if not issues:
-                break
+    return all_issues
 
-            # Filter out pull requests (they also appear in issues endpoint)
-            issues = [i for i in issues if "pull_request" not in i]
-            all_issues.extend(issues)
 
-            print(f"Fetched page {page} of {state} issues ({len(issues)} issues)")
+async def backfill_issue(owner: str, repo_name: str, issue: dict, index: dict, sem: asyncio.Semaphore) -> str:
+    """Backfill a single issue; returns "created", "updated", "skipped" or "error"."""
+    issue_number = issue["number"]
+    issue_title = issue["title"][:50]
 
-            if len(issues) < per_page:
-                break
-            page += 1
+    # Skip pages already synced from this version of the issue
+    existing_page = index.get(str(issue_number))
+    if existing_page and is_unchanged(existing_page, issue):
+        return "skipped"
 
-    return all_issues
+    async with sem:
+        try:
+            # Comments arrive with the GraphQL issue page, so new pages get
+            # them without a separate comments request.
+            if existing_page:
+                if await update_notion_page(existing_page["id"], issue, repo_name) is None:
+                    return "skipped"
+                print(f"  Updated: #{issue_number} - {issue_title}...")
+                return "updated"
+
+            await create_notion_page(issue, repo_name, issue["comments_nodes"])
+            print(f"  Created: #{issue_number} - {issue_title}...")
+            return "created"
+
+        except Exception as e:
+            print(f"  ERROR: #{issue_number} - {e}")
+            return "error"
 
 
-def backfill():
+async def backfill():
     """Backfill all existing GitHub issues to Notion."""
     if not GITHUB_TOKEN:
         print("ERROR: GITHUB_TOKEN not set")
@@ -87,45 +109,32 @@ def backfill():
     print(f"Backfilling issues from {owner}/{repo_name} to Notion...")
     print("-" * 50)
 
-    # Get all issues
-    issues = get_all_issues(owner, repo_name)
-    print(f"\nFound {len(issues)} issues to sync")
-    print("-" * 50)
-
-    created = 0
-    updated = 0
-    errors = 0
-
-    for issue in issues:
-        issue_number = issue["number"]
-        issue_title = issue["title"][:50]
+    try:
+        # Get all issues
+        issues = await get_all_issues(owner, repo_name)
+        print(f"\nFound {len(issues)} issues to sync")
+        print("-" * 50)
 
-        try:
-            # Get comments for this issue
-            comments = get_issue_comments(owner, repo_name, issue_number)
-
-            # Check if page exists
-            existing_page = find_existing_page(issue_number, repo_name)
+        # Load existing Notion pages once instead of querying per issue
+        index = await load_repo_index(repo_name)
 
-            if existing_page:
-                update_notion_page(existing_page["id"], issue, repo_name, comments)
-                updated += 1
-                print(f"  Updated: #{issue_number} - {issue_title}...")
-            else:
-                create_notion_page(issue, repo_name, comments)
-                created += 1
-                print(f"  Created: #{issue_number} - {issue_title}...")
+        sem = asyncio.Semaphore(ISSUE_CONCURRENCY)
+        results = await asyncio.gather(*[backfill_issue(owner, repo_name, issue, index, sem) for issue in issues])
+    finally:
+        await close_session()
 
-        except Exception as e:
-            errors += 1
-            print(f"  ERROR: #{issue_number} - {e}")
+    created = results.count("created")
+    updated = results.count("updated")
+    skipped = results.count("skipped")
+    errors = results.count("error")
 
     print("-" * 50)
     print(f"Backfill complete!")
     print(f"  Created: {created}")
     print(f"  Updated: {updated}")
+    print(f"  Unchanged: {skipped}")
     print(f"  Errors: {errors}")
 
 
 if __name__ == "__main__":
-    backfill()
+    asyncio.run(backfill())
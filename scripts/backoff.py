@@ -0,0 +1,18 @@
+"""
+Retry delay calculation shared by the aiohttp and requests based scripts.
+"""
+
+import random
+
+# First retry waits ~BACKOFF_BASE seconds, doubling on each further attempt
+BACKOFF_BASE = 0.4
+
+
+def retry_delay(attempt: int, retry_after: str = None) -> float:
+    """Seconds to wait before retry `attempt` (0-based): Retry-After if usable, else jittered backoff."""
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass  # HTTP-date form; fall back to backoff
+    return BACKOFF_BASE * 2 ** attempt * random.uniform(0.5, 1.5)
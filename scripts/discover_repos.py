@@ -9,10 +9,28 @@ Usage:
 """
 
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from scripts import etag_cache
+from scripts.backoff import retry_delay
 
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
 GITHUB_API_BASE = "https://api.github.com"
+GITHUB_HEADERS = {
+    "Authorization": f"Bearer {GITHUB_TOKEN}",
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+}
 
 # =============================================================================
 # YOUR ORGANIZATIONS - add/remove as needed
@@ -25,12 +43,68 @@ ORGS = [
 # =============================================================================
 
 
-def get_github_headers():
-    return {
-        "Authorization": f"Bearer {GITHUB_TOKEN}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
+def make_session(headers: dict) -> requests.Session:
+    """Create a pooled keep-alive Session that retries transient failures."""
+    retry = Retry(
+        total=5,
+        backoff_factor=0.4,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "POST", "PATCH"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.headers.update(headers)
+    return session
+
+
+GH_SESSION = make_session(GITHUB_HEADERS)
+# (connect, read) seconds; fail fast on a dead connection instead of hanging the job
+GH_TIMEOUT = (3.05, 30)
+
+# Pause until the rate-limit window resets once fewer requests than this remain
+GITHUB_RATE_LIMIT_FLOOR = 50
+# Retries for rate-limited (403/429) responses
+GITHUB_MAX_RETRIES = 5
+
+
+def gh_get(url: str, params: dict = None):
+    """Conditional GET using the on-disk ETag cache; returns (status, body)."""
+    cache_key = etag_cache.key(url, params)
+    cached = etag_cache.get(cache_key)
+
+    headers = {"If-None-Match": cached["etag"]} if cached else {}
+
+    for attempt in range(GITHUB_MAX_RETRIES + 1):
+        resp = GH_SESSION.get(url, headers=headers, params=params, timeout=GH_TIMEOUT)
+
+        remaining = int(resp.headers.get("X-RateLimit-Remaining", "5000"))
+        if remaining < GITHUB_RATE_LIMIT_FLOOR:
+            reset = int(resp.headers.get("X-RateLimit-Reset", "0"))
+            time.sleep(max(0, reset - time.time()) + 1)
+            # Primary rate limit (no budget left, no Retry-After): the window
+            # has reset by now, so retry rather than give up after the wait
+            if resp.status_code in (403, 429) and remaining == 0 and attempt < GITHUB_MAX_RETRIES:
+                continue
+
+        retry_after = resp.headers.get("Retry-After")
+        if resp.status_code in (403, 429) and retry_after and attempt < GITHUB_MAX_RETRIES:
+            time.sleep(retry_delay(attempt, retry_after))
+            continue
+        break
+
+    if resp.status_code == 304 and cached:
+        return 200, cached["body"]
+    if resp.status_code != 200:
+        return resp.status_code, None
+
+    body = orjson.loads(resp.content)
+    etag = resp.headers.get("ETag")
+    if etag:
+        etag_cache.put(cache_key, etag, body)
+    return 200, body
 
 
 def get_org_repos(org_name: str):
@@ -41,12 +115,11 @@ def get_org_repos(org_name: str):
     while True:
         url = f"{GITHUB_API_BASE}/orgs/{org_name}/repos"
         params = {"per_page": 100, "page": page}
-        resp = requests.get(url, headers=get_github_headers(), params=params)
+        status, repos = gh_get(url, params)
 
-        if resp.status_code != 200:
+        if status != 200:
             break
 
-        repos = resp.json()
         if not repos:
             break
 
@@ -66,12 +139,11 @@ def get_user_repos():
     while True:
         url = f"{GITHUB_API_BASE}/user/repos"
         params = {"per_page": 100, "page": page, "affiliation": "owner"}
-        resp = requests.get(url, headers=get_github_headers(), params=params)
+        status, repos = gh_get(url, params)
 
-        if resp.status_code != 200:
+        if status != 200:
             break
 
-        repos = resp.json()
         if not repos:
             break
 
@@ -83,6 +155,18 @@ def get_user_repos():
     return all_repos
 
 
+def format_repo_line(repo: dict) -> str:
+    has_issues = "✓" if repo.get("has_issues") else "✗"
+    return f"  {has_issues} {repo['full_name']} ({repo.get('open_issues_count', 0)} open issues)\n"
+
+
+def print_repos(repos: list, all_repos: list):
+    """Print repos sorted by name in a single write and collect their full names."""
+    sorted_repos = sorted(repos, key=itemgetter("name"))
+    sys.stdout.write("".join(format_repo_line(repo) for repo in sorted_repos))
+    all_repos.extend(repo["full_name"] for repo in sorted_repos)
+
+
 def main():
     if not GITHUB_TOKEN:
         print("ERROR: GITHUB_TOKEN not set")
@@ -98,44 +182,41 @@ def main():
     # Get repos from configured orgs
     print(f"\n📁 Scanning {len(ORGS)} organizations...")
 
+    # Fetch every org (plus personal repos) in parallel; results are printed
+    # afterwards in ORGS order so the output stays deterministic.
+    org_repos = {}
+    with ThreadPoolExecutor(max_workers=len(ORGS) + 1) as ex:
+        personal_future = ex.submit(get_user_repos)
+        futures = {ex.submit(get_org_repos, org_name): org_name for org_name in ORGS}
+        for future in as_completed(futures):
+            org_repos[futures[future]] = future.result()
+        personal = personal_future.result()
+    etag_cache.save()
+
     for org_name in ORGS:
-        repos = get_org_repos(org_name)
+        repos = org_repos[org_name]
         print(f"\n🏢 {org_name} ({len(repos)} repos)")
         print("-" * 40)
-
-        for repo in sorted(repos, key=lambda r: r["name"]):
-            full_name = repo["full_name"]
-            has_issues = "✓" if repo.get("has_issues") else "✗"
-            open_issues = repo.get("open_issues_count", 0)
-            print(f"  {has_issues} {full_name} ({open_issues} open issues)")
-            all_repos.append(full_name)
+        print_repos(repos, all_repos)
 
     # Get personal repos
     print(f"\n👤 Personal Repos")
     print("-" * 40)
-    personal = get_user_repos()
-    for repo in sorted(personal, key=lambda r: r["name"]):
-        full_name = repo["full_name"]
-        has_issues = "✓" if repo.get("has_issues") else "✗"
-        open_issues = repo.get("open_issues_count", 0)
-        print(f"  {has_issues} {full_name} ({open_issues} open issues)")
-        all_repos.append(full_name)
+    print_repos(personal, all_repos)
 
     # Print config snippet
     print("\n" + "=" * 60)
     print("📋 Copy this to sync_all_repos.py REPOS list:")
     print("=" * 60)
     print("\nREPOS = [")
-    for repo in all_repos:
-        print(f'    "{repo}",')
+    sys.stdout.write("".join(f'    "{repo}",\n' for repo in all_repos))
     print("]")
 
     print("\n📋 Source mapping template:")
     print("=" * 60)
     print("\nREPO_SOURCE_MAP = {")
-    for repo in all_repos:
-        repo_name = repo.split("/")[-1]
-        print(f'    "{repo_name}": "{repo_name}",')
+    repo_names = [repo.split("/")[-1] for repo in all_repos]
+    sys.stdout.write("".join(f'    "{name}": "{name}",\n' for name in repo_names))
     print("}")
 
 
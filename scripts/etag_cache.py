@@ -0,0 +1,75 @@
+"""
+On-disk ETag cache for GitHub conditional requests.
+
+Maps a request key (URL + query string) to the last ETag and parsed body seen
+for it, so a 304 Not Modified can be answered from disk without re-downloading
+the payload. 304 responses do not count against GitHub's rate limit.
+
+Every script shares one cache file, so save() merges this run's entries into
+what is already on disk rather than overwriting it. Each entry records when it
+was last used; entries no script has touched for MAX_AGE_SECONDS are dropped,
+so keys that stop being requested (e.g. issues that were deleted) age out.
+"""
+
+import os
+import time
+from urllib.parse import urlencode
+
+import orjson
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".etag_cache.json")
+
+# Drop entries that no run has read or written for this long
+MAX_AGE_SECONDS = 7 * 24 * 3600
+
+_cache = None
+_used = set()
+
+
+def key(url: str, params: dict = None) -> str:
+    """Build the cache key for a request."""
+    return f"{url}?{urlencode(params)}" if params else url
+
+
+def _read() -> dict:
+    try:
+        with open(CACHE_PATH, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+
+def load() -> dict:
+    """Load the cache from disk (once per process) and return it."""
+    global _cache
+    if _cache is None:
+        _cache = _read()
+    return _cache
+
+
+def get(cache_key: str):
+    """Return the cached {"etag", "body", "next"} entry for a key, or None."""
+    _used.add(cache_key)
+    return load().get(cache_key)
+
+
+def put(cache_key: str, etag: str, body, next_url: str = None):
+    """Store the ETag, parsed body and next-page URL for a key."""
+    _used.add(cache_key)
+    load()[cache_key] = {"etag": etag, "body": body, "next": next_url}
+
+
+def save():
+    """Merge the entries used this run into the file on disk, dropping stale ones."""
+    if _cache is None:
+        return
+    now = time.time()
+    # Re-read so entries another script saved since load() are kept
+    merged = _read()
+    for cache_key in _used:
+        if cache_key in _cache:
+            _cache[cache_key]["used_at"] = now
+            merged[cache_key] = _cache[cache_key]
+    merged = {k: v for k, v in merged.items() if now - v.get("used_at", 0) < MAX_AGE_SECONDS}
+    with open(CACHE_PATH, "wb") as f:
+        f.write(orjson.dumps(merged))
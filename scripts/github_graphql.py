@@ -0,0 +1,89 @@
+"""
+GitHub GraphQL issue fetching.
+
+One GraphQL request returns up to 100 issues together with their labels,
+assignees, milestone and first 100 comments, replacing a REST list call plus a
+comments call per issue. Labels and assignees are requested up to 100, which
+covers GitHub's per-issue maximums: a truncated label list would be written to
+Notion and then synced back, deleting labels on GitHub.
+
+Issues are paged in creation order, a key that does not change mid-walk, so
+an issue edited during a backfill cannot jump ahead of the cursor and be
+skipped.
+
+Results are normalized to the REST issue shape used by the rest of the
+scripts, with comment bodies under "comments_nodes".
+"""
+
+import orjson
+
+from scripts.http_client import get_github_session, with_retries
+
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+ISSUES_QUERY = """
+query($owner: String!, $repo: String!, $cursor: String) {
+  repository(owner: $owner, name: $repo) {
+    issues(first: 100, after: $cursor, orderBy: {field: CREATED_AT, direction: ASC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        body
+        state
+        url
+        updatedAt
+        labels(first: 100) { nodes { name } }
+        assignees(first: 100) { nodes { login } }
+        milestone { title dueOn }
+        comments(first: 100) {
+          totalCount
+          nodes { body createdAt author { login } }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def to_rest_issue(node: dict) -> dict:
+    """Convert a GraphQL issue node to the REST issue shape."""
+    milestone = node.get("milestone")
+    return {
+        "number": node["number"],
+        "title": node["title"],
+        "body": node.get("body") or "",
+        "state": node["state"].lower(),
+        "html_url": node["url"],
+        "updated_at": node["updatedAt"],
+        "labels": [{"name": l["name"]} for l in node["labels"]["nodes"]],
+        "assignees": [{"login": a["login"]} for a in node["assignees"]["nodes"]],
+        "milestone": {"title": milestone["title"], "due_on": milestone.get("dueOn")} if milestone else None,
+        "comments": node["comments"]["totalCount"],
+        "comments_nodes": [
+            {
+                "body": c.get("body") or "",
+                "created_at": c.get("createdAt") or "",
+                "user": {"login": (c.get("author") or {}).get("login", "Unknown")},
+            }
+            for c in node["comments"]["nodes"]
+        ],
+    }
+
+
+@with_retries
+async def fetch_issues(owner: str, repo: str, cursor: str = None):
+    """Fetch one page of issues; returns (issues, next_cursor) with next_cursor None on the last page."""
+    payload = {"query": ISSUES_QUERY, "variables": {"owner": owner, "repo": repo, "cursor": cursor}}
+    async with get_github_session().post(GITHUB_GRAPHQL_URL, json=payload) as resp:
+        resp.raise_for_status()
+        data = await resp.json(loads=orjson.loads)
+
+    if data.get("errors"):
+        raise RuntimeError(f"GitHub GraphQL error: {data['errors'][0].get('message')}")
+
+    issues = data["data"]["repository"]["issues"]
+    page_info = issues["pageInfo"]
+    next_cursor = page_info["endCursor"] if page_info["hasNextPage"] else None
+    return [to_rest_issue(node) for node in issues["nodes"]], next_cursor
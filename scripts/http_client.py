@@ -0,0 +1,295 @@
+"""
+Shared aiohttp clients used by the sync scripts.
+
+GitHub and Notion each get their own pooled ClientSession, created lazily
+inside the running event loop with that host's auth headers preset, and reused
+for the whole run so TCP/TLS handshakes are amortized. The pools are sized per
+host: GitHub tolerates many parallel requests, while Notion is held to a few
+connections since it only accepts ~3 requests/second anyway. Call
+close_session() before the loop shuts down.
+
+GitHub GETs go through gh_get(), which revalidates against the on-disk ETag
+cache (see etag_cache.py); call etag_cache.save() at the end of a run.
+
+JSON bodies are encoded with orjson; decode responses with
+`await resp.json(loads=orjson.loads)`.
+
+Every request made through either session is recorded in REQUEST_LOG; call
+request_stats() for a summary at the end of a run.
+
+Notion calls go through notion_request(), which paces them with notion_limiter
+to stay under Notion's 3 requests/second per-integration limit.
+
+Transient failures (429, 5xx, dropped connections, timeouts) are retried with
+jittered exponential backoff, or after Retry-After when the server sends one:
+gh_get() handles this itself, and other helpers are wrapped in @with_retries.
+Creates are only retried where the write cannot have happened.
+"""
+
+import asyncio
+import functools
+import os
+import time
+from collections import deque
+
+import aiohttp
+import orjson
+
+from scripts import etag_cache
+from scripts.backoff import retry_delay
+
+GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
+GITHUB_HEADERS = {
+    "Authorization": f"Bearer {GITHUB_TOKEN}",
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+}
+
+NOTION_API_KEY = os.environ.get("NOTION_API_KEY", "")
+NOTION_BASE_URL = "https://api.notion.com/v1"
+NOTION_HEADERS = {
+    "Authorization": f"Bearer {NOTION_API_KEY}",
+    "Notion-Version": "2022-06-28",
+    "Content-Type": "application/json",
+}
+
+# Connection pool size per host
+GITHUB_CONNECTIONS = 20
+NOTION_CONNECTIONS = 4
+
+_sessions: dict[str, aiohttp.ClientSession] = {}
+
+# Rolling (timestamp, duration_ms, status) record of HTTP requests; status 0 = connection error
+REQUEST_LOG = deque(maxlen=10000)
+
+
+class NotionRateLimiter:
+    """Spaces request starts at least `interval` seconds apart across all coroutines."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._loop = None
+        self._lock = None
+        self._next_slot = 0.0
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Each asyncio.run() gets a fresh loop; rebind to it
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._next_slot = 0.0
+
+        async with self._lock:
+            now = loop.time()
+            if self._next_slot > now:
+                await asyncio.sleep(self._next_slot - now)
+            self._next_slot = max(now, self._next_slot) + self.interval
+
+    def defer(self, delay: float):
+        """Hold back every caller's next slot by at least `delay` seconds (e.g. after a 429)."""
+        if self._loop is not None:
+            self._next_slot = max(self._next_slot, self._loop.time() + delay)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+notion_limiter = NotionRateLimiter(interval=0.34)
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 5
+
+# Pause until the rate-limit window resets once fewer requests than this remain
+GITHUB_RATE_LIMIT_FLOOR = 50
+
+
+async def call_with_retries(fn, *args, idempotent: bool = True, **kwargs):
+    """
+    Await fn(*args, **kwargs), retrying transient failures.
+
+    Idempotent calls retry RETRY_STATUSES responses, connection errors and
+    timeouts. A create (idempotent=False) may already have been applied when a
+    5xx, timeout or dropped connection comes back, so it is retried only on 429
+    and when the connection could not be opened at all.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return await fn(*args, **kwargs)
+        except aiohttp.ClientResponseError as e:
+            retryable = e.status in RETRY_STATUSES if idempotent else e.status == 429
+            if not retryable or attempt == MAX_RETRIES:
+                raise
+            retry_after = e.headers.get("Retry-After") if e.headers else None
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            # ClientConnectorError: connecting failed, so nothing reached the server
+            retryable = idempotent or isinstance(e, aiohttp.ClientConnectorError)
+            if not retryable or attempt == MAX_RETRIES:
+                raise
+            retry_after = None
+        await asyncio.sleep(retry_delay(attempt, retry_after))
+
+
+def with_retries(fn=None, *, idempotent: bool = True):
+    """Decorator form of call_with_retries: @with_retries or @with_retries(idempotent=False)."""
+    if fn is None:
+        return functools.partial(with_retries, idempotent=idempotent)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await call_with_retries(fn, *args, idempotent=idempotent, **kwargs)
+    return wrapper
+
+
+async def _on_request_start(session, ctx, params):
+    ctx.started = time.monotonic()
+
+
+async def _on_request_end(session, ctx, params):
+    REQUEST_LOG.append((time.time(), (time.monotonic() - ctx.started) * 1000, params.response.status))
+
+
+async def _on_request_exception(session, ctx, params):
+    REQUEST_LOG.append((time.time(), (time.monotonic() - ctx.started) * 1000, 0))
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(_on_request_start)
+    trace.on_request_end.append(_on_request_end)
+    trace.on_request_exception.append(_on_request_exception)
+    return trace
+
+
+def request_stats(window: float = 60.0) -> dict:
+    """Summarize REQUEST_LOG: totals, 429 count and average latency, plus req/s over the last `window` seconds."""
+    entries = list(REQUEST_LOG)
+    recent = sum(1 for ts, _, _ in entries if ts >= time.time() - window)
+    return {
+        "requests": len(entries),
+        "rate_limited": sum(1 for _, _, status in entries if status == 429),
+        "avg_ms": sum(ms for _, ms, _ in entries) / len(entries) if entries else 0.0,
+        "per_second": recent / window,
+    }
+
+
+def _get_session(name: str, headers: dict, limit: int) -> aiohttp.ClientSession:
+    session = _sessions.get(name)
+    if session is None or session.closed:
+        session = _sessions[name] = aiohttp.ClientSession(
+            # Keep idle connections around between bursts and cache DNS for the
+            # run, so later calls skip the TCP/TLS handshake and lookup
+            connector=aiohttp.TCPConnector(
+                limit=limit,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True,
+            ),
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=60, sock_connect=3.05, sock_read=30),
+            json_serialize=lambda obj: orjson.dumps(obj).decode(),
+            trace_configs=[_trace_config()],
+        )
+    return session
+
+
+def get_github_session() -> aiohttp.ClientSession:
+    """Return the shared GitHub ClientSession, creating it on first use."""
+    return _get_session("github", GITHUB_HEADERS, GITHUB_CONNECTIONS)
+
+
+def get_notion_session() -> aiohttp.ClientSession:
+    """Return the shared Notion ClientSession, creating it on first use."""
+    return _get_session("notion", NOTION_HEADERS, NOTION_CONNECTIONS)
+
+
+async def close_session():
+    """Close every open ClientSession."""
+    for session in _sessions.values():
+        if not session.closed:
+            await session.close()
+    _sessions.clear()
+
+
+async def gh_get(url: str, params: dict = None, cache: bool = True):
+    """
+    Conditional GET against the GitHub API.
+
+    Sends If-None-Match when an ETag is cached for this URL + params and serves
+    the cached body on 304. Returns (status, body, next_url), where next_url is
+    the Link rel="next" target (None on the last page); body is None on errors.
+    Pass cache=False for URLs that will not be requested again (e.g. ones
+    carrying a moving since=), so their bodies stay out of the ETag cache.
+    """
+    cache_key = etag_cache.key(url, params)
+    cached = etag_cache.get(cache_key) if cache else None
+
+    headers = {"If-None-Match": cached["etag"]} if cached else None
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with get_github_session().get(url, headers=headers, params=params) as resp:
+                status = resp.status
+                retry_after = resp.headers.get("Retry-After")
+                remaining = int(resp.headers.get("X-RateLimit-Remaining", "5000"))
+                reset = int(resp.headers.get("X-RateLimit-Reset", "0"))
+
+                if status == 200:
+                    body = await resp.json(loads=orjson.loads)
+                    next_link = resp.links.get("next")
+                    next_url = str(next_link["url"]) if next_link else None
+                    etag = resp.headers.get("ETag")
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(retry_delay(attempt))
+            continue
+
+        # Slow down before the budget runs out rather than failing mid-run
+        if remaining < GITHUB_RATE_LIMIT_FLOOR:
+            await asyncio.sleep(max(0, reset - time.time()) + 1)
+            # Primary rate limit (no budget left, no Retry-After): the window
+            # has reset by now, so retry rather than give up after the wait
+            if status in (403, 429) and remaining == 0 and attempt < MAX_RETRIES:
+                continue
+
+        # 403 + Retry-After is GitHub's secondary rate limit
+        retryable = status in RETRY_STATUSES or (status == 403 and retry_after)
+        if retryable and attempt < MAX_RETRIES:
+            await asyncio.sleep(retry_delay(attempt, retry_after))
+            continue
+
+        if status == 304 and cached:
+            return 200, cached["body"], cached.get("next")
+        if status != 200:
+            return status, None, None
+
+        if cache and etag:
+            etag_cache.put(cache_key, etag, body, next_url)
+        return 200, body, next_url
+
+
+async def notion_request(method: str, url: str, payload: dict = None, params=None, idempotent: bool = True) -> dict:
+    """
+    Paced Notion API call; returns the parsed JSON body.
+
+    Each attempt waits its turn on notion_limiter. A 429 also defers the
+    limiter by the response's Retry-After so every in-flight caller backs off,
+    not just the one that was rejected. Error statuses raise
+    aiohttp.ClientResponseError once retries are exhausted. Pass
+    idempotent=False for creates and appends (see call_with_retries).
+    """
+    return await call_with_retries(_notion_send, method, url, payload, params, idempotent=idempotent)
+
+
+async def _notion_send(method: str, url: str, payload: dict, params) -> dict:
+    async with notion_limiter, get_notion_session().request(method, url, json=payload, params=params) as resp:
+        if resp.status == 429:
+            notion_limiter.defer(retry_delay(0, resp.headers.get("Retry-After")))
+        resp.raise_for_status()
+        return await resp.json(loads=orjson.loads)
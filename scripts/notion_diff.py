@@ -0,0 +1,75 @@
+"""
+Compare GitHub issues with the Notion pages that mirror them.
+
+Notion returns richer objects than we send (ids, plain_text, annotations,
+timestamps with milliseconds), so both sides are reduced to a plain value
+before comparing. Also holds the per-repo page index and the "Last Synced"
+check shared by the sync scripts.
+"""
+
+from scripts.http_client import NOTION_BASE_URL, notion_request
+from scripts.sync_state import parse_iso
+
+
+def _text(item: dict) -> str:
+    return item.get("plain_text") or item.get("text", {}).get("content", "")
+
+
+def property_value(prop: dict):
+    """Reduce a Notion property, as sent or as returned, to a comparable value."""
+    if not prop:
+        return None
+
+    kind = prop.get("type") or next(iter(prop))
+    value = prop.get(kind)
+
+    if kind in ("title", "rich_text"):
+        return "".join(_text(item) for item in value or [])
+    if kind == "select":
+        return value["name"] if value else None
+    if kind == "multi_select":
+        return frozenset(option["name"] for option in value or [])
+    if kind == "date":
+        start = (value or {}).get("start")
+        # Datetimes come back reformatted (e.g. "...T10:00:00.000+00:00")
+        return parse_iso(start) if start and "T" in start else start
+    return value
+
+
+def diff_properties(existing: dict, desired: dict) -> dict:
+    """Return the entries of `desired` whose value differs from the page's `existing` properties."""
+    return {
+        name: prop
+        for name, prop in desired.items()
+        if property_value(existing.get(name)) != property_value(prop)
+    }
+
+
+def is_unchanged(page: dict, issue: dict) -> bool:
+    """True if the page's Last Synced is at or after the issue's updated_at."""
+    last_synced = (page["properties"].get("Last Synced", {}).get("date") or {}).get("start")
+    return bool(last_synced) and parse_iso(last_synced) >= parse_iso(issue["updated_at"])
+
+
+async def load_repo_index(database_id: str, repo: str) -> dict:
+    """Map Issue ID -> Notion page for every page of a repo, in one paginated query."""
+    url = f"{NOTION_BASE_URL}/databases/{database_id}/query"
+    payload = {
+        "filter": {"property": "Repo", "rich_text": {"equals": repo}},
+        "page_size": 100,
+    }
+    index = {}
+
+    while True:
+        data = await notion_request("POST", url, payload)
+
+        for page in data.get("results", []):
+            issue_id = page["properties"].get("Issue ID", {}).get("rich_text", [])
+            if issue_id:
+                index[issue_id[0]["plain_text"]] = page
+
+        if not data.get("has_more"):
+            break
+        payload["start_cursor"] = data["next_cursor"]
+
+    return index
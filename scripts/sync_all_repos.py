@@ -3,6 +3,8 @@
 Central sync script - pulls issues from multiple repos to one Notion database.
 Configure REPOS list below with your repositories.
 
+The Notion database must have a "Last Synced" date property (see README).
+
 Usage:
     export NOTION_API_KEY="your-key"
     export NOTION_DATABASE_ID="your-db-id"
@@ -10,9 +12,17 @@ Usage:
     python scripts/sync_all_repos.py
 """
 
+import asyncio
+import io
 import os
 import sys
-import requests
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts import etag_cache, sync_state
+from scripts.http_client import close_session, gh_get, notion_request
+from scripts.notion_diff import diff_properties, is_unchanged, load_repo_index
 
 # =============================================================================
 # CONFIGURE YOUR REPOS HERE
@@ -51,139 +61,113 @@ NOTION_DATABASE_ID = os.environ.get("NOTION_DATABASE_ID", "")
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
 
 NOTION_BASE_URL = "https://api.notion.com/v1"
-NOTION_HEADERS = {
-    "Authorization": f"Bearer {NOTION_API_KEY}",
-    "Notion-Version": "2022-06-28",
-    "Content-Type": "application/json",
-}
 
 GITHUB_API_BASE = "https://api.github.com"
 
 
-def get_github_headers():
-    return {
-        "Authorization": f"Bearer {GITHUB_TOKEN}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
-
-
 # =============================================================================
 # GitHub Functions
 # =============================================================================
 
-def get_all_issues(owner: str, repo: str) -> list:
-    """Fetch all issues (open and closed) from a GitHub repo."""
+async def get_all_issues(owner: str, repo: str, since: str = None) -> list:
+    """Fetch all issues (open and closed) from a GitHub repo, optionally only those updated since `since`."""
     all_issues = []
 
-    for state in ["open", "closed"]:
-        page = 1
-        while True:
-            url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues"
-            params = {"state": state, "per_page": 100, "page": page}
-            resp = requests.get(url, headers=get_github_headers(), params=params)
+    # One state=all pass, following Link rel="next" (which keeps the query)
+    url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues"
+    params = {"state": "all", "per_page": 100, "sort": "updated", "direction": "desc"}
+    if since:
+        params["since"] = since
 
-            if resp.status_code != 200:
-                print(f"  Error fetching {owner}/{repo}: {resp.status_code}")
-                break
+    # since= changes every run, so those URLs are never revalidated; keep them out of the ETag cache
+    while url:
+        status, issues, url = await gh_get(url, params, cache=not since)
+        params = None
 
-            issues = resp.json()
-            if not issues:
-                break
+        if status != 200:
+            raise RuntimeError(f"GitHub returned {status} fetching {owner}/{repo} issues")
 
-            # Filter out pull requests
-            issues = [i for i in issues if "pull_request" not in i]
-            all_issues.extend(issues)
-
-            if len(issues) < 100:
-                break
-            page += 1
+        # Filter out pull requests
+        all_issues.extend(i for i in issues if "pull_request" not in i)
 
     return all_issues
 
 
-def get_issue_comments(owner: str, repo: str, issue_number: int) -> list:
-    """Fetch comments for an issue."""
-    url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues/{issue_number}/comments"
-    resp = requests.get(url, headers=get_github_headers())
-    if resp.status_code == 200:
-        return resp.json()
-    return []
-
-
 # =============================================================================
 # Notion Functions
 # =============================================================================
 
-def find_existing_page(issue_id: int, repo: str):
-    """Find existing Notion page by Issue ID and Repo."""
-    url = f"{NOTION_BASE_URL}/databases/{NOTION_DATABASE_ID}/query"
-    payload = {
-        "filter": {
-            "and": [
-                {"property": "Issue ID", "rich_text": {"equals": str(issue_id)}},
-                {"property": "Repo", "rich_text": {"equals": repo}},
-            ]
-        }
-    }
-    resp = requests.post(url, headers=NOTION_HEADERS, json=payload)
-    if resp.status_code == 200:
-        results = resp.json().get("results", [])
-        return results[0] if results else None
-    return None
+# Lowercased label names that drive status / priority (matched by set intersection)
+HIGH_PRIORITY_LABELS = frozenset({"high-priority", "high", "urgent"})
+MEDIUM_PRIORITY_LABELS = frozenset({"medium", "medium-priority"})
+LOW_PRIORITY_LABELS = frozenset({"low", "low-priority"})
+BLOCKED_LABELS = frozenset({"blocked"})
+IN_PROGRESS_LABELS = frozenset({"in-progress", "in progress"})
+REVIEW_LABELS = frozenset({"review", "under-review"})
 
 
-def get_priority_from_labels(labels: list) -> str:
-    """Extract priority from GitHub labels."""
-    label_names = [l["name"].lower() for l in labels]
-    if "high-priority" in label_names or "high" in label_names or "urgent" in label_names:
+def get_priority_from_labels(label_names: frozenset) -> str:
+    """Extract priority from lowercased GitHub label names."""
+    if label_names & HIGH_PRIORITY_LABELS:
         return "High"
-    if "medium" in label_names or "medium-priority" in label_names:
+    if label_names & MEDIUM_PRIORITY_LABELS:
         return "Medium"
-    if "low" in label_names or "low-priority" in label_names:
+    if label_names & LOW_PRIORITY_LABELS:
         return "Low"
     return "Medium"
 
 
-def map_status(issue_state: str, labels: list) -> str:
-    """Map GitHub state + labels to Notion status."""
+def map_status(issue_state: str, label_names: frozenset) -> str:
+    """Map GitHub state + lowercased label names to Notion status."""
     if issue_state == "closed":
         return "Done"
 
-    label_names = [l["name"].lower() for l in labels]
-    if "blocked" in label_names:
+    if label_names & BLOCKED_LABELS:
         return "Blocked"
-    if "in-progress" in label_names or "in progress" in label_names:
+    if label_names & IN_PROGRESS_LABELS:
         return "In Progress"
-    if "review" in label_names or "under-review" in label_names:
+    if label_names & REVIEW_LABELS:
         return "Under Review"
 
     return "Backlog"
 
 
+def classify(issue: dict) -> tuple:
+    """Return (status, priority) for an issue, lowercasing its labels once."""
+    label_names = frozenset(l["name"].lower() for l in issue.get("labels", []))
+    return map_status(issue["state"], label_names), get_priority_from_labels(label_names)
+
+
+# Shared label / milestone sub-objects, reused across issues within a run
+_LABEL_CACHE: dict[str, dict] = {}
+_MILESTONE_CACHE: dict[str, dict] = {}
+
+
 def build_properties(issue: dict, repo_name: str, source: str, comments_count: int = 0) -> dict:
     """Build Notion properties from GitHub issue."""
     labels = issue.get("labels", [])
     milestone = issue.get("milestone")
     assignees = issue.get("assignees", [])
+    status, priority = classify(issue)
 
     properties = {
         "Name": {"title": [{"text": {"content": issue["title"]}}]},
         "Issue ID": {"rich_text": [{"text": {"content": str(issue["number"])}}]},
         "Repo": {"rich_text": [{"text": {"content": repo_name}}]},
         "URL": {"url": issue["html_url"]},
-        "Status": {"select": {"name": map_status(issue["state"], labels)}},
+        "Status": {"select": {"name": status}},
         "Source": {"select": {"name": source}},
-        "Priority": {"select": {"name": get_priority_from_labels(labels)}},
+        "Priority": {"select": {"name": priority}},
     }
 
     # Labels
-    label_options = [{"name": l["name"]} for l in labels]
+    label_options = [_LABEL_CACHE.setdefault(l["name"], {"name": l["name"]}) for l in labels]
     properties["Labels"] = {"multi_select": label_options} if label_options else {"multi_select": []}
 
     # Milestone
     if milestone:
-        properties["Milestone"] = {"select": {"name": milestone["title"]}}
+        title = milestone["title"]
+        properties["Milestone"] = _MILESTONE_CACHE.setdefault(title, {"select": {"name": title}})
         if milestone.get("due_on"):
             properties["Due Date"] = {"date": {"start": milestone["due_on"][:10]}}
 
@@ -194,10 +178,18 @@ def build_properties(issue: dict, repo_name: str, source: str, comments_count: i
     # Comments count
     properties["Comments"] = {"number": comments_count}
 
+    # Issue updated_at at the time of sync, used to skip unchanged issues
+    properties["Last Synced"] = {"date": {"start": issue["updated_at"]}}
+
     return properties
 
 
-def create_notion_page(issue: dict, repo_name: str, source: str, comments_count: int = 0):
+def make_block(content: str) -> dict:
+    """Build a paragraph block holding `content` (max 2000 chars)."""
+    return {"object": "block", "type": "paragraph", "paragraph": {"rich_text": [{"type": "text", "text": {"content": content}}]}}
+
+
+async def create_notion_page(issue: dict, repo_name: str, source: str, comments_count: int = 0):
     """Create a Notion page."""
     url = f"{NOTION_BASE_URL}/pages"
     properties = build_properties(issue, repo_name, source, comments_count)
@@ -207,69 +199,112 @@ def create_notion_page(issue: dict, repo_name: str, source: str, comments_count:
         "properties": properties,
     }
 
-    # Add issue body as content
-    issue_body = issue.get("body") or ""
-    if issue_body:
-        truncated = issue_body[:4000]
-        chunks = [truncated[i:i+2000] for i in range(0, len(truncated), 2000)]
-        payload["children"] = [
-            {"object": "block", "type": "paragraph", "paragraph": {"rich_text": [{"type": "text", "text": {"content": c}}]}}
-            for c in chunks
-        ]
+    # Add issue body as content (first 4000 chars, 2000 per block)
+    body = (issue.get("body") or "")[:4000]
+    if body:
+        payload["children"] = [make_block(body[i:i+2000]) for i in range(0, len(body), 2000)]
 
-    resp = requests.post(url, headers=NOTION_HEADERS, json=payload)
-    resp.raise_for_status()
-    return resp.json()
+    return await notion_request("POST", url, payload, idempotent=False)
 
 
-def update_notion_page(page_id: str, issue: dict, repo_name: str, source: str, comments_count: int = 0):
-    """Update a Notion page."""
-    url = f"{NOTION_BASE_URL}/pages/{page_id}"
-    properties = build_properties(issue, repo_name, source, comments_count)
-    resp = requests.patch(url, headers=NOTION_HEADERS, json={"properties": properties})
-    resp.raise_for_status()
-    return resp.json()
+async def update_notion_page(page: dict, issue: dict, repo_name: str, source: str, comments_count: int = 0):
+    """Update a Notion page with only the properties that changed; returns None if none did."""
+    url = f"{NOTION_BASE_URL}/pages/{page['id']}"
+    properties = diff_properties(page["properties"], build_properties(issue, repo_name, source, comments_count))
+    if not properties:
+        return None
+    return await notion_request("PATCH", url, {"properties": properties})
 
 
 # =============================================================================
 # Main Sync
 # =============================================================================
 
-def sync_repo(owner: str, repo: str):
-    """Sync all issues from a single repo."""
-    source = REPO_SOURCE_MAP.get(repo, repo)
+# Max repos synced at once; all repos share one Notion rate limiter
+REPO_CONCURRENCY = 4
+# Max Notion writes in flight per repo (requests are also paced by notion_request)
+NOTION_WRITE_CONCURRENCY = 3
+# Per-issue log lines are buffered and written every this many issues
+OUTPUT_FLUSH_EVERY = 50
 
-    print(f"\n📦 Syncing {owner}/{repo} → Source: {source}")
-    print("-" * 50)
 
-    issues = get_all_issues(owner, repo)
-    print(f"  Found {len(issues)} issues")
+def flush_output(buf: io.StringIO):
+    """Write buffered log lines to stdout and reset the buffer."""
+    sys.stdout.write(buf.getvalue())
+    buf.seek(0)
+    buf.truncate()
 
-    created, updated, errors = 0, 0, 0
 
-    for issue in issues:
+async def sync_issue(owner: str, repo: str, source: str, issue: dict, index: dict, sem: asyncio.Semaphore, out: io.StringIO) -> str:
+    """Sync a single issue; returns "created", "updated", "skipped" or "error"."""
+    existing = index.get(str(issue["number"]))
+    if existing and is_unchanged(existing, issue):
+        return "skipped"
+
+    async with sem:
         try:
-            comments = get_issue_comments(owner, repo, issue["number"])
-            existing = find_existing_page(issue["number"], repo)
+            # The issues list already carries the comment count, so the
+            # comments endpoint is never needed just to fill "Comments".
+            comments_count = issue.get("comments", 0)
 
             if existing:
-                update_notion_page(existing["id"], issue, repo, source, len(comments))
-                updated += 1
+                if await update_notion_page(existing, issue, repo, source, comments_count) is None:
+                    return "skipped"
             else:
-                create_notion_page(issue, repo, source, len(comments))
-                created += 1
+                await create_notion_page(issue, repo, source, comments_count)
 
-            print(f"  {'✓' if existing else '+'} #{issue['number']} {issue['title'][:40]}...")
+            out.write(f"  {'✓' if existing else '+'} {owner}/{repo}#{issue['number']} {issue['title'][:40]}...\n")
+            return "updated" if existing else "created"
 
         except Exception as e:
-            errors += 1
-            print(f"  ✗ #{issue['number']} Error: {e}")
+            out.write(f"  ✗ {owner}/{repo}#{issue['number']} Error: {e}\n")
+            return "error"
+
 
-    print(f"  Summary: {created} created, {updated} updated, {errors} errors")
+async def sync_repo(owner: str, repo: str):
+    """Sync all issues from a single repo."""
+    source = REPO_SOURCE_MAP.get(repo, repo)
+
+    print(f"\n📦 Syncing {owner}/{repo} → Source: {source}")
+    print("-" * 50)
+
+    last_sync = sync_state.load()
+    started_at = sync_state.now_iso()
+
+    try:
+        issues = await get_all_issues(owner, repo, since=last_sync.get(f"{owner}/{repo}"))
+        # Repos sync concurrently, so every line names its repo
+        print(f"  [{owner}/{repo}] Found {len(issues)} issues updated since last sync")
+        # Nothing changed: skip the Notion index query entirely
+        index = await load_repo_index(NOTION_DATABASE_ID, repo) if issues else {}
+    except Exception as e:
+        print(f"  ✗ Error loading {owner}/{repo}: {e}")
+        return 0, 0, 1
+
+    sem = asyncio.Semaphore(NOTION_WRITE_CONCURRENCY)
+    buf = io.StringIO()
+    results = []
+    tasks = [sync_issue(owner, repo, source, issue, index, sem, buf) for issue in issues]
+    for i, task in enumerate(asyncio.as_completed(tasks), 1):
+        results.append(await task)
+        if i % OUTPUT_FLUSH_EVERY == 0:
+            flush_output(buf)
+    flush_output(buf)
+
+    created = results.count("created")
+    updated = results.count("updated")
+    skipped = results.count("skipped")
+    errors = results.count("error")
+
+    # Only advance the checkpoint when every issue made it to Notion
+    if not errors:
+        last_sync[f"{owner}/{repo}"] = started_at
+
+    print(f"  [{owner}/{repo}] Summary: {created} created, {updated} updated, {skipped} unchanged, {errors} errors")
     return created, updated, errors
 
 
-def main():
+async def main():
     """Sync all configured repos."""
     if not NOTION_API_KEY or not NOTION_DATABASE_ID or not GITHUB_TOKEN:
         print("ERROR: Missing environment variables")
@@ -283,16 +318,29 @@ def main():
 
     total_created, total_updated, total_errors = 0, 0, 0
 
+    repos = []
     for repo_full in REPOS:
         if "/" not in repo_full:
             print(f"⚠️  Skipping invalid repo format: {repo_full}")
             continue
+        repos.append(repo_full.split("/", 1))
+
+    sem = asyncio.Semaphore(REPO_CONCURRENCY)
+
+    async def sync_bounded(owner: str, repo: str):
+        async with sem:
+            return await sync_repo(owner, repo)
 
-        owner, repo = repo_full.split("/", 1)
-        c, u, e = sync_repo(owner, repo)
-        total_created += c
-        total_updated += u
-        total_errors += e
+    try:
+        # Repos are independent, so sync several at once
+        for c, u, e in await asyncio.gather(*[sync_bounded(owner, repo) for owner, repo in repos]):
+            total_created += c
+            total_updated += u
+            total_errors += e
+    finally:
+        await close_session()
+        etag_cache.save()
+        sync_state.save()
 
     print("\n" + "=" * 60)
     print("✅ Sync Complete!")
@@ -301,4 +349,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
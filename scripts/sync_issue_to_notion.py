@@ -1,6 +1,19 @@
-import json
+import asyncio
+import logging
 import os
-import requests
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+import orjson
+from scripts import etag_cache, notion_diff, sync_state
+from scripts.http_client import get_github_session, close_session, gh_get, notion_request, request_stats, with_retries
+from scripts.notion_diff import diff_properties
+from scripts.ttl_cache import MISSING, TTLCache
+
+logger = logging.getLogger(__name__)
 
 NOTION_API_KEY = os.environ["NOTION_API_KEY"]
 NOTION_DATABASE_ID = os.environ["NOTION_DATABASE_ID"]
@@ -9,27 +22,30 @@ GITHUB_EVENT_PATH = os.environ.get("GITHUB_EVENT_PATH", "")
 GITHUB_REPO_NAME = os.environ.get("GITHUB_REPO_NAME", "")
 
 NOTION_BASE_URL = "https://api.notion.com/v1"
-NOTION_HEADERS = {
-    "Authorization": f"Bearer {NOTION_API_KEY}",
-    "Notion-Version": "2022-06-28",
-    "Content-Type": "application/json",
-}
 
 GITHUB_API_BASE = "https://api.github.com"
 
+# Max Notion pages reconciled against GitHub at once (GitHub secondary rate limits)
+GITHUB_CONCURRENCY = 8
 
-def get_github_headers():
-    return {
-        "Authorization": f"Bearer {GITHUB_TOKEN}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
+# Only these properties are read back when syncing Notion → GitHub
+SYNC_BACK_PROPERTIES = ("Issue ID", "Repo", "Status", "Labels")
+
+# Notion accepts at most 100 child blocks per create / append request
+NOTION_MAX_CHILDREN = 100
+
+# Short-lived lookup caches: (issue_id, repo) -> Notion page, (owner, repo, number) -> GitHub issue / comments
+PAGE_CACHE = TTLCache(maxsize=1024, ttl=60)
+ISSUE_CACHE = TTLCache(maxsize=2048, ttl=60)
+COMMENTS_CACHE = TTLCache(maxsize=2048, ttl=60)
+# Last known properties per Notion page id, so updates can send only what changed
+PROPERTY_SNAPSHOTS = TTLCache(maxsize=4096, ttl=3600)
 
 
 def load_github_event():
     if GITHUB_EVENT_PATH and os.path.exists(GITHUB_EVENT_PATH):
-        with open(GITHUB_EVENT_PATH, "r") as f:
-            return json.load(f)
+        with open(GITHUB_EVENT_PATH, "rb") as f:
+            return orjson.loads(f.read())
     return {}
 
 
@@ -51,20 +67,26 @@ NOTION_TO_GITHUB_STATUS = {
     "Done": "closed",
 }
 
+# Lowercased label names that drive status / priority (matched by set intersection)
+HIGH_PRIORITY_LABELS = frozenset({"high-priority", "high", "urgent"})
+MEDIUM_PRIORITY_LABELS = frozenset({"medium", "medium-priority"})
+LOW_PRIORITY_LABELS = frozenset({"low", "low-priority"})
+BLOCKED_LABELS = frozenset({"blocked"})
+IN_PROGRESS_LABELS = frozenset({"in-progress", "in progress"})
+REVIEW_LABELS = frozenset({"review", "under-review"})
+
 
-def map_status_to_notion(issue_state: str, labels: list = None) -> str:
-    """Map GitHub issue state + labels to Notion Status."""
+def map_status_to_notion(issue_state: str, label_names: frozenset = frozenset()) -> str:
+    """Map GitHub issue state + lowercased label names to Notion Status."""
     if issue_state == "closed":
         return "Done"
 
-    if labels:
-        label_names = [l["name"].lower() for l in labels]
-        if "blocked" in label_names:
-            return "Blocked"
-        if "in-progress" in label_names or "in progress" in label_names:
-            return "In Progress"
-        if "review" in label_names or "under-review" in label_names:
-            return "Under Review"
+    if label_names & BLOCKED_LABELS:
+        return "Blocked"
+    if label_names & IN_PROGRESS_LABELS:
+        return "In Progress"
+    if label_names & REVIEW_LABELS:
+        return "Under Review"
 
     return "Backlog"
 
@@ -78,63 +100,104 @@ def map_status_to_github(notion_status: str) -> str:
 # GitHub API Functions
 # =============================================================================
 
-def get_issue_comments(owner: str, repo: str, issue_number: int) -> list:
+async def get_issue_comments(owner: str, repo: str, issue_number: int) -> list:
     """Fetch all comments for a GitHub issue."""
+    cache_key = (owner, repo, issue_number)
+    comments = COMMENTS_CACHE.get(cache_key)
+    if comments is not MISSING:
+        return comments
+
+    # Follow Link rel="next" (which keeps the query) so issues with more than
+    # one page of comments are not cut short
     url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues/{issue_number}/comments"
-    resp = requests.get(url, headers=get_github_headers())
-    if resp.status_code == 200:
-        return resp.json()
-    return []
+    params = {"per_page": 100}
+    comments = []
+    while url:
+        status, page, url = await gh_get(url, params)
+        params = None
+        if status != 200:
+            return []
+        comments.extend(page)
 
+    COMMENTS_CACHE.set(cache_key, comments)
+    return comments
 
-def get_issue_details(owner: str, repo: str, issue_number: int) -> dict:
-    """Fetch full issue details from GitHub."""
-    url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues/{issue_number}"
-    resp = requests.get(url, headers=get_github_headers())
-    if resp.status_code == 200:
-        return resp.json()
-    return {}
 
+async def get_issue_details(owner: str, repo: str, issue_number: int) -> dict:
+    """Fetch full issue details from GitHub; {} if the issue no longer exists, raises on other failures."""
+    cache_key = (owner, repo, issue_number)
+    issue = ISSUE_CACHE.get(cache_key)
+    if issue is not MISSING:
+        return issue
 
-def update_github_issue(owner: str, repo: str, issue_number: int, updates: dict):
+    # Conditional GET: an unchanged issue comes back as a 304 served from the ETag cache
+    url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues/{issue_number}"
+    status, issue, _ = await gh_get(url)
+    # 404 Not Found / 410 Gone: the issue was deleted or moved; nothing to sync back
+    if status in (404, 410):
+        return {}
+    if status != 200:
+        # Raise so the page counts as an error and the checkpoint does not advance
+        raise RuntimeError(f"GitHub returned {status} for {owner}/{repo}#{issue_number}")
+    ISSUE_CACHE.set(cache_key, issue)
+    return issue
+
+
+@with_retries
+async def update_github_issue(owner: str, repo: str, issue_number: int, updates: dict):
     """Update a GitHub issue."""
     url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues/{issue_number}"
-    resp = requests.patch(url, headers=get_github_headers(), json=updates)
-    resp.raise_for_status()
-    print(f"Updated GitHub issue #{issue_number}")
-    return resp.json()
+    async with get_github_session().patch(url, json=updates) as resp:
+        resp.raise_for_status()
+        issue = await resp.json(loads=orjson.loads)
+    ISSUE_CACHE.invalidate((owner, repo, issue_number))
+    logger.info("Updated GitHub issue #%s", issue_number)
+    return issue
 
 
-def add_github_comment(owner: str, repo: str, issue_number: int, body: str):
+@with_retries(idempotent=False)
+async def add_github_comment(owner: str, repo: str, issue_number: int, body: str):
     """Add a comment to a GitHub issue."""
     url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues/{issue_number}/comments"
-    resp = requests.post(url, headers=get_github_headers(), json={"body": body})
-    resp.raise_for_status()
-    print(f"Added comment to GitHub issue #{issue_number}")
-    return resp.json()
+    async with get_github_session().post(url, json={"body": body}) as resp:
+        resp.raise_for_status()
+        comment = await resp.json(loads=orjson.loads)
+    COMMENTS_CACHE.invalidate((owner, repo, issue_number))
+    logger.info("Added comment to GitHub issue #%s", issue_number)
+    return comment
 
 
-def close_github_issue(owner: str, repo: str, issue_number: int):
+async def close_github_issue(owner: str, repo: str, issue_number: int):
     """Close a GitHub issue."""
-    return update_github_issue(owner, repo, issue_number, {"state": "closed"})
+    return await update_github_issue(owner, repo, issue_number, {"state": "closed"})
 
 
-def reopen_github_issue(owner: str, repo: str, issue_number: int):
+async def reopen_github_issue(owner: str, repo: str, issue_number: int):
     """Reopen a GitHub issue."""
-    return update_github_issue(owner, repo, issue_number, {"state": "open"})
+    return await update_github_issue(owner, repo, issue_number, {"state": "open"})
 
 
-def update_github_labels(owner: str, repo: str, issue_number: int, labels: list):
+async def update_github_labels(owner: str, repo: str, issue_number: int, labels: list):
     """Update labels on a GitHub issue."""
-    return update_github_issue(owner, repo, issue_number, {"labels": labels})
+    return await update_github_issue(owner, repo, issue_number, {"labels": labels})
 
 
 # =============================================================================
 # Notion API Functions
 # =============================================================================
 
-def find_existing_page(issue_id: int, repo: str):
+def remember_properties(page: dict):
+    """Snapshot a full page object's properties for later diffing."""
+    PROPERTY_SNAPSHOTS.set(page["id"], page["properties"])
+
+
+async def find_existing_page(issue_id: int, repo: str):
     """Query the Notion database for an existing page matching Issue ID + Repo."""
+    cache_key = (str(issue_id), repo)
+    page = PAGE_CACHE.get(cache_key)
+    if page is not MISSING:
+        return page
+
     url = f"{NOTION_BASE_URL}/databases/{NOTION_DATABASE_ID}/query"
     payload = {
         "filter": {
@@ -144,84 +207,118 @@ def find_existing_page(issue_id: int, repo: str):
             ]
         }
     }
-    resp = requests.post(url, headers=NOTION_HEADERS, json=payload)
-    resp.raise_for_status()
-    results = resp.json().get("results", [])
-    return results[0] if results else None
+    results = (await notion_request("POST", url, payload)).get("results", [])
+    page = results[0] if results else None
+    PAGE_CACHE.set(cache_key, page)
+    if page:
+        remember_properties(page)
+    return page
+
+
+async def load_repo_index(repo: str) -> dict:
+    """Map Issue ID -> Notion page for a repo, snapshotting each page for update diffs."""
+    index = await notion_diff.load_repo_index(NOTION_DATABASE_ID, repo)
+    for page in index.values():
+        remember_properties(page)
+    return index
 
 
-def get_all_notion_pages():
-    """Get all pages from the Notion database."""
+async def get_property_ids(names) -> list:
+    """Resolve database property names to the IDs that filter_properties expects."""
+    url = f"{NOTION_BASE_URL}/databases/{NOTION_DATABASE_ID}"
+    schema = (await notion_request("GET", url)).get("properties", {})
+    return [schema[name]["id"] for name in names if name in schema]
+
+
+async def iter_notion_pages(repo: str, since: str = None):
+    """Yield the RevGen pages for a repo (edited on or after `since`, if given), with only the synced-back properties."""
     url = f"{NOTION_BASE_URL}/databases/{NOTION_DATABASE_ID}/query"
-    all_pages = []
+    params = [("filter_properties", prop_id) for prop_id in await get_property_ids(SYNC_BACK_PROPERTIES)]
+    conditions = [
+        {"property": "Source", "select": {"equals": "RevGen"}},
+        {"property": "Repo", "rich_text": {"equals": repo}},
+    ]
+    if since:
+        conditions.append({"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": since}})
     has_more = True
     start_cursor = None
 
     while has_more:
-        payload = {}
+        payload = {"filter": {"and": conditions}, "page_size": 100}
         if start_cursor:
             payload["start_cursor"] = start_cursor
 
-        resp = requests.post(url, headers=NOTION_HEADERS, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
+        data = await notion_request("POST", url, payload, params)
 
-        all_pages.extend(data.get("results", []))
+        for page in data.get("results", []):
+            yield page
         has_more = data.get("has_more", False)
         start_cursor = data.get("next_cursor")
 
-    return all_pages
 
-
-def get_notion_page_content(page_id: str) -> list:
+async def get_notion_page_content(page_id: str) -> list:
     """Get the content blocks of a Notion page."""
     url = f"{NOTION_BASE_URL}/blocks/{page_id}/children"
-    resp = requests.get(url, headers=NOTION_HEADERS)
-    if resp.status_code == 200:
-        return resp.json().get("results", [])
-    return []
+    try:
+        return (await notion_request("GET", url)).get("results", [])
+    except aiohttp.ClientResponseError:
+        return []
 
 
-def get_priority_from_labels(labels: list) -> str:
-    """Extract priority from GitHub labels."""
-    label_names = [l["name"].lower() for l in labels]
-    if "high-priority" in label_names or "high" in label_names or "urgent" in label_names:
+def get_priority_from_labels(label_names: frozenset) -> str:
+    """Extract priority from lowercased GitHub label names."""
+    if label_names & HIGH_PRIORITY_LABELS:
         return "High"
-    if "medium" in label_names or "medium-priority" in label_names:
+    if label_names & MEDIUM_PRIORITY_LABELS:
         return "Medium"
-    if "low" in label_names or "low-priority" in label_names:
+    if label_names & LOW_PRIORITY_LABELS:
         return "Low"
     return "Medium"  # Default
 
 
+def classify(issue: dict) -> tuple:
+    """Return (status, priority) for an issue, lowercasing its labels once."""
+    label_names = frozenset(l["name"].lower() for l in issue.get("labels", []))
+    return map_status_to_notion(issue["state"], label_names), get_priority_from_labels(label_names)
+
+
+# Shared label / milestone sub-objects, reused across issues within a run
+_LABEL_CACHE: dict[str, dict] = {}
+_MILESTONE_CACHE: dict[str, dict] = {}
+# Status / Priority select values (a handful of names), shared the same way
+_SELECT_CACHE: dict[str, dict] = {}
+
+# Properties that are the same on every page; build_properties copies this and
+# fills in the per-issue fields. Nested objects are shared, never mutated.
+_PROPERTY_TEMPLATE = {
+    "Source": {"select": {"name": "RevGen"}},
+}
+
+
 def build_properties(issue: dict, repo_name: str, comments_count: int = 0, optional_props: bool = False) -> dict:
     """Build Notion properties payload from GitHub issue."""
     issue_title = issue["title"]
     issue_number = issue["number"]
     issue_url = issue["html_url"]
-    issue_state = issue["state"]
     labels = issue.get("labels", [])
     milestone = issue.get("milestone")
     assignees = issue.get("assignees", [])
 
-    status_value = map_status_to_notion(issue_state, labels)
-    priority_value = get_priority_from_labels(labels)
+    status_value, priority_value = classify(issue)
 
     # Core properties (always included)
-    properties = {
-        "Name": {"title": [{"text": {"content": issue_title}}]},
-        "Issue ID": {"rich_text": [{"text": {"content": str(issue_number)}}]},
-        "Repo": {"rich_text": [{"text": {"content": repo_name}}]},
-        "URL": {"url": issue_url},
-        "Status": {"select": {"name": status_value}},
-        "Source": {"select": {"name": "RevGen"}},
-        "Priority": {"select": {"name": priority_value}},
-    }
+    properties = _PROPERTY_TEMPLATE.copy()
+    properties["Name"] = {"title": [{"text": {"content": issue_title}}]}
+    properties["Issue ID"] = {"rich_text": [{"text": {"content": str(issue_number)}}]}
+    properties["Repo"] = {"rich_text": [{"text": {"content": repo_name}}]}
+    properties["URL"] = {"url": issue_url}
+    properties["Status"] = _SELECT_CACHE.setdefault(status_value, {"select": {"name": status_value}})
+    properties["Priority"] = _SELECT_CACHE.setdefault(priority_value, {"select": {"name": priority_value}})
 
     # Optional properties (only if database has them configured)
     if optional_props:
         # Build labels multi-select
-        label_options = [{"name": label["name"]} for label in labels]
+        label_options = [_LABEL_CACHE.setdefault(label["name"], {"name": label["name"]}) for label in labels]
         if label_options:
             properties["Labels"] = {"multi_select": label_options}
         else:
@@ -229,7 +326,8 @@ def build_properties(issue: dict, repo_name: str, comments_count: int = 0, optio
 
         # Add milestone if present
         if milestone:
-            properties["Milestone"] = {"select": {"name": milestone["title"]}}
+            title = milestone["title"]
+            properties["Milestone"] = _MILESTONE_CACHE.setdefault(title, {"select": {"name": title}})
             # Add due date from milestone if available
             if milestone.get("due_on"):
                 # due_on format: "2024-01-15T00:00:00Z"
@@ -244,25 +342,50 @@ def build_properties(issue: dict, repo_name: str, comments_count: int = 0, optio
         # Add comments count
         properties["Comments"] = {"number": comments_count}
 
+        # Issue updated_at at the time of sync, used to skip unchanged issues
+        properties["Last Synced"] = {"date": {"start": issue["updated_at"]}}
+
     return properties
 
 
-def build_comment_blocks(comments: list) -> list:
-    """Build Notion blocks for comments."""
-    blocks = []
+def build_body_blocks(body: str) -> list:
+    """Build paragraph blocks for an issue body."""
+    # Split body into chunks (Notion has 2000 char limit per block)
+    # Also limit total length to avoid issues
+    truncated_body = (body or "")[:4000]
+    return [
+        {
+            "object": "block",
+            "type": "paragraph",
+            "paragraph": {
+                "rich_text": [{"type": "text", "text": {"content": truncated_body[i:i+2000]}}]
+            }
+        }
+        for i in range(0, len(truncated_body), 2000)
+    ]
 
-    if not comments:
-        return blocks
 
-    # Add a divider and header
-    blocks.append({"object": "block", "type": "divider", "divider": {}})
-    blocks.append({
+# Divider + "Comments" heading placed above a page's comment callouts
+_COMMENTS_HEADER_BLOCKS = (
+    {"object": "block", "type": "divider", "divider": {}},
+    {
         "object": "block",
         "type": "heading_2",
         "heading_2": {
             "rich_text": [{"type": "text", "text": {"content": "Comments"}}]
         }
-    })
+    },
+)
+_COMMENT_ICON = {"emoji": "💬"}
+
+
+def build_comment_blocks(comments: list) -> list:
+    """Build Notion blocks for comments."""
+    if not comments:
+        return []
+
+    # Add a divider and header
+    blocks = list(_COMMENTS_HEADER_BLOCKS)
 
     for comment in comments:
         author = comment.get("user", {}).get("login", "Unknown")
@@ -277,81 +400,95 @@ def build_comment_blocks(comments: list) -> list:
                 "rich_text": [
                     {"type": "text", "text": {"content": f"@{author} on {created_at}\n\n{body}"}}
                 ],
-                "icon": {"emoji": "💬"}
+                "icon": _COMMENT_ICON
             }
         })
 
     return blocks
 
 
-def create_notion_page(issue: dict, repo_name: str, comments: list = None):
+async def create_notion_page(issue: dict, repo_name: str, comments: list = None):
     """Create a new Notion page for a GitHub issue."""
     url = f"{NOTION_BASE_URL}/pages"
     comments = comments or []
-    properties = build_properties(issue, repo_name, len(comments), optional_props=True)
+    # The issue payload already carries the comment count
+    comments_count = issue.get("comments", len(comments))
+    properties = build_properties(issue, repo_name, comments_count, optional_props=True)
 
     payload = {
         "parent": {"database_id": NOTION_DATABASE_ID},
         "properties": properties,
     }
 
-    # Optionally add issue body as page content
-    issue_body = issue.get("body") or ""
-    if issue_body:
-        children = []
-        # Split body into chunks (Notion has 2000 char limit per block)
-        # Also limit total length to avoid issues
-        truncated_body = issue_body[:4000]
-        chunks = [truncated_body[i:i+2000] for i in range(0, len(truncated_body), 2000)]
-        for chunk in chunks:
-            children.append({
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [{"type": "text", "text": {"content": chunk}}]
-                }
-            })
-        payload["children"] = children
-
-    resp = requests.post(url, headers=NOTION_HEADERS, json=payload)
-    resp.raise_for_status()
-    print(f"Created Notion page for issue #{issue['number']}")
-    return resp.json()
-
-
-def update_notion_page(page_id: str, issue: dict, repo_name: str, comments: list = None):
-    """Update an existing Notion page."""
+    # Issue body and comments as page content; anything past the first
+    # NOTION_MAX_CHILDREN blocks is appended once the page exists
+    children = build_body_blocks(issue.get("body")) + build_comment_blocks(comments)
+    if children:
+        payload["children"] = children[:NOTION_MAX_CHILDREN]
+
+    page = await notion_request("POST", url, payload, idempotent=False)
+    remember_properties(page)
+    PAGE_CACHE.invalidate((str(issue["number"]), repo_name))
+    await append_notion_blocks(page["id"], children[NOTION_MAX_CHILDREN:])
+    logger.info("Created Notion page for issue #%s", issue["number"])
+    return page
+
+
+async def update_notion_page(page_id: str, issue: dict, repo_name: str, comments: list = None):
+    """Update an existing Notion page; returns None if no property changed."""
     url = f"{NOTION_BASE_URL}/pages/{page_id}"
     comments = comments or []
-    properties = build_properties(issue, repo_name, len(comments), optional_props=True)
+    # The issue payload already carries the comment count
+    comments_count = issue.get("comments", len(comments))
+    properties = build_properties(issue, repo_name, comments_count, optional_props=True)
+
+    # Send only the properties that differ from the last known snapshot
+    snapshot = PROPERTY_SNAPSHOTS.get(page_id)
+    if snapshot is not MISSING:
+        properties = diff_properties(snapshot, properties)
+        if not properties:
+            logger.info("Notion page for issue #%s already up to date", issue["number"])
+            return None
 
     payload = {"properties": properties}
-    resp = requests.patch(url, headers=NOTION_HEADERS, json=payload)
-    resp.raise_for_status()
-    print(f"Updated Notion page for issue #{issue['number']}")
-    return resp.json()
+    try:
+        page = await notion_request("PATCH", url, payload)
+    except Exception:
+        # The page may be in an unknown state; diff against a fresh read next time
+        PROPERTY_SNAPSHOTS.invalidate(page_id)
+        raise
+    remember_properties(page)
+    PAGE_CACHE.invalidate((str(issue["number"]), repo_name))
+    logger.info("Updated Notion page for issue #%s", issue["number"])
+    return page
+
+
+async def append_notion_blocks(page_id: str, blocks: list):
+    """Append blocks to a Notion page, NOTION_MAX_CHILDREN per request."""
+    url = f"{NOTION_BASE_URL}/blocks/{page_id}/children"
+    for i in range(0, len(blocks), NOTION_MAX_CHILDREN):
+        payload = {"children": blocks[i:i + NOTION_MAX_CHILDREN]}
+        # Appending is not idempotent: a blind retry could duplicate blocks
+        await notion_request("PATCH", url, payload, idempotent=False)
 
 
-def append_notion_comments(page_id: str, comments: list):
+async def append_notion_comments(page_id: str, comments: list):
     """Append new comments to a Notion page."""
     if not comments:
         return
 
-    url = f"{NOTION_BASE_URL}/blocks/{page_id}/children"
     blocks = build_comment_blocks(comments)
 
     if blocks:
-        payload = {"children": blocks}
-        resp = requests.patch(url, headers=NOTION_HEADERS, json=payload)
-        resp.raise_for_status()
-        print(f"Appended {len(comments)} comments to Notion page")
+        await append_notion_blocks(page_id, blocks)
+        logger.info("Appended %d comments to Notion page", len(comments))
 
 
 # =============================================================================
 # Sync Functions
 # =============================================================================
 
-def sync_github_to_notion():
+async def sync_github_to_notion():
     """Sync a GitHub issue event to Notion."""
     event = load_github_event()
     action = event.get("action")
@@ -359,7 +496,7 @@ def sync_github_to_notion():
     comment = event.get("comment")
 
     if not issue:
-        print("No issue in event payload.")
+        logger.info("No issue in event payload.")
         return
 
     # Parse repo info
@@ -368,117 +505,187 @@ def sync_github_to_notion():
 
     issue_number = issue["number"]
 
-    # Fetch comments from GitHub
-    comments = []
-    if owner and repo_name:
-        comments = get_issue_comments(owner, repo_name, issue_number)
-
     # Find or create Notion page
-    existing_page = find_existing_page(issue_number, repo_name)
+    existing_page = await find_existing_page(issue_number, repo_name)
 
     if existing_page:
-        update_notion_page(existing_page["id"], issue, repo_name, comments)
+        # The payload carries the comment count, so updates need no comment fetch
+        await update_notion_page(existing_page["id"], issue, repo_name)
 
-        # If this is a new comment, append it
+        # If this is a new comment, append it straight from the payload
         if action == "created" and comment:
-            append_notion_comments(existing_page["id"], [comment])
+            await append_notion_comments(existing_page["id"], [comment])
     else:
         if action in ("opened", "reopened", "edited"):
-            create_notion_page(issue, repo_name, comments)
+            # A fresh page gets the full comment history, if there is any
+            comments = []
+            if owner and repo_name and issue.get("comments", 0) > 0:
+                comments = await get_issue_comments(owner, repo_name, issue_number)
+            await create_notion_page(issue, repo_name, comments)
         else:
-            print(f"No existing page and action is '{action}', skipping.")
+            logger.info("No existing page and action is '%s', skipping.", action)
 
 
-def sync_notion_to_github():
-    """Sync Notion changes back to GitHub (bidirectional sync)."""
-    if not GITHUB_TOKEN:
-        print("GITHUB_TOKEN not set, skipping Notion → GitHub sync")
-        return
+async def sync_notion_page_to_github(page: dict, owner: str):
+    """Push one Notion page's Status and Labels back to its GitHub issue."""
+    props = page.get("properties", {})
 
-    print("Starting Notion → GitHub sync...")
-    pages = get_all_notion_pages()
+    # Extract issue info
+    issue_id_prop = props.get("Issue ID", {}).get("rich_text", [])
+    repo_prop = props.get("Repo", {}).get("rich_text", [])
+    status_prop = props.get("Status", {}).get("select", {})
+    labels_prop = props.get("Labels", {}).get("multi_select", [])
 
-    for page in pages:
-        try:
-            props = page.get("properties", {})
+    if not issue_id_prop or not repo_prop:
+        return
 
-            # Extract issue info
-            issue_id_prop = props.get("Issue ID", {}).get("rich_text", [])
-            repo_prop = props.get("Repo", {}).get("rich_text", [])
-            status_prop = props.get("Status", {}).get("select", {})
-            labels_prop = props.get("Labels", {}).get("multi_select", [])
+    issue_id = issue_id_prop[0]["text"]["content"]
+    if not issue_id.strip().isdigit():
+        # A hand-edited Issue ID can never sync; skip it rather than hold back the checkpoint
+        logger.warning("Skipping Notion page %s: Issue ID %r is not an issue number", page.get("id"), issue_id)
+        return
+    issue_number = int(issue_id)
+    repo_name = repo_prop[0]["text"]["content"]
+    notion_status = status_prop.get("name", "Backlog") if status_prop else "Backlog"
+    # Labels as sorted tuples: compared directly, no per-page set building
+    notion_labels = tuple(sorted(l["name"] for l in labels_prop))
+
+    # Fetch current GitHub issue state
+    gh_issue = await get_issue_details(owner, repo_name, issue_number)
+    if not gh_issue:
+        return
 
-            if not issue_id_prop or not repo_prop:
-                continue
+    gh_state = gh_issue.get("state", "open")
+    gh_labels = tuple(sorted(l["name"] for l in gh_issue.get("labels", [])))
 
-            issue_number = int(issue_id_prop[0]["text"]["content"])
-            repo_name = repo_prop[0]["text"]["content"]
-            notion_status = status_prop.get("name", "Backlog") if status_prop else "Backlog"
-            notion_labels = [l["name"] for l in labels_prop]
+    # Determine expected GitHub state from Notion
+    expected_gh_state = map_status_to_github(notion_status)
+    state_matches = gh_state == expected_gh_state
+    labels_match = gh_labels == notion_labels
 
-            # Determine owner (assumes same owner as current repo)
-            owner = GITHUB_REPO_NAME.split("/")[0] if "/" in GITHUB_REPO_NAME else ""
-            if not owner:
-                continue
+    # Already in sync: nothing to write
+    if state_matches and labels_match:
+        return
 
-            # Fetch current GitHub issue state
-            gh_issue = get_issue_details(owner, repo_name, issue_number)
-            if not gh_issue:
-                continue
+    # Collect state and label changes so they go out in one PATCH
+    updates = {}
+    if not state_matches:
+        updates["state"] = expected_gh_state
+    if not labels_match:
+        updates["labels"] = list(notion_labels)
 
-            gh_state = gh_issue.get("state", "open")
-            gh_labels = [l["name"] for l in gh_issue.get("labels", [])]
+    await update_github_issue(owner, repo_name, issue_number, updates)
+    logger.info("Synced Notion → GitHub for issue #%s", issue_number)
 
-            # Determine expected GitHub state from Notion
-            expected_gh_state = map_status_to_github(notion_status)
 
-            updates_made = False
+async def sync_notion_to_github():
+    """Sync Notion changes back to GitHub (bidirectional sync)."""
+    if not GITHUB_TOKEN:
+        logger.warning("GITHUB_TOKEN not set, skipping Notion → GitHub sync")
+        return
 
-            # Sync state changes
-            if gh_state != expected_gh_state:
-                if expected_gh_state == "closed":
-                    close_github_issue(owner, repo_name, issue_number)
-                else:
-                    reopen_github_issue(owner, repo_name, issue_number)
-                updates_made = True
+    # Only the current repo's pages are synced back (GITHUB_TOKEN is scoped to it)
+    if "/" not in GITHUB_REPO_NAME:
+        return
+    owner, repo_name = GITHUB_REPO_NAME.split("/", 1)
 
-            # Sync label changes
-            if set(gh_labels) != set(notion_labels):
-                update_github_labels(owner, repo_name, issue_number, notion_labels)
-                updates_made = True
+    logger.info("Starting Notion → GitHub sync...")
+    last_sync = sync_state.load()
+    checkpoint = f"notion:{GITHUB_REPO_NAME}"
+    # Notion's last_edited_time only has minute precision, so checkpoint at the
+    # start of the minute: edits later in this minute still match on_or_after
+    started_at = sync_state.now_iso_minute()
 
-            if updates_made:
-                print(f"Synced Notion → GitHub for issue #{issue_number}")
+    sem = asyncio.Semaphore(GITHUB_CONCURRENCY)
+    tasks = set()
+    errors = []
+    page_count = 0
 
+    async def sync_page(page: dict):
+        try:
+            await sync_notion_page_to_github(page, owner)
         except Exception as e:
-            print(f"Error syncing page: {e}")
-            continue
+            logger.error("Error syncing page: %s", e)
+            errors.append(e)
+        finally:
+            sem.release()
+
+    # Take a slot before pulling the next page, so pages are synced as they
+    # stream in rather than after the whole query has been read
+    async for page in iter_notion_pages(repo_name, since=last_sync.get(checkpoint)):
+        page_count += 1
+        await sem.acquire()
+        task = asyncio.create_task(sync_page(page))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    logger.info("Checked %d pages edited since last sync", page_count)
 
-    print("Notion → GitHub sync complete.")
+    # Only advance the checkpoint when every page made it to GitHub
+    if not errors:
+        last_sync[checkpoint] = started_at
+
+    logger.info("Notion → GitHub sync complete.")
 
 
 # =============================================================================
 # Main Entry Points
 # =============================================================================
 
+def log_run_stats():
+    """Report cache hit rates and HTTP request metrics for the run."""
+    logger.info("Notion page cache: %s", PAGE_CACHE.stats())
+    logger.info("GitHub issue cache: %s", ISSUE_CACHE.stats())
+    logger.info("GitHub comments cache: %s", COMMENTS_CACHE.stats())
+    stats = request_stats()
+    logger.info(
+        "HTTP: %d requests, %d rate-limited (429), avg %.0f ms, %.2f req/s over the last 60s",
+        stats["requests"], stats["rate_limited"], stats["avg_ms"], stats["per_second"],
+    )
+
+
+async def run_github_to_notion():
+    """Run the GitHub → Notion sync and release the shared HTTP session."""
+    try:
+        await sync_github_to_notion()
+    finally:
+        await close_session()
+        etag_cache.save()
+        log_run_stats()
+
+
 def main():
     """Main entry point for GitHub → Notion sync (triggered by GitHub Actions)."""
-    sync_github_to_notion()
+    asyncio.run(run_github_to_notion())
+
+
+async def run_bidirectional():
+    """Run both sync directions on one event loop and HTTP session."""
+    # Each scheduled run starts from fresh lookups (ETag revalidation keeps misses cheap)
+    for cache in (PAGE_CACHE, ISSUE_CACHE, COMMENTS_CACHE):
+        cache.clear()
+
+    try:
+        # First sync any pending GitHub changes
+        if GITHUB_EVENT_PATH:
+            await sync_github_to_notion()
+
+        # Then sync Notion changes back to GitHub
+        await sync_notion_to_github()
+    finally:
+        await close_session()
+        etag_cache.save()
+        sync_state.save()
+        log_run_stats()
 
 
 def main_bidirectional():
     """Entry point for bidirectional sync (scheduled)."""
-    # First sync any pending GitHub changes
-    if GITHUB_EVENT_PATH:
-        sync_github_to_notion()
-
-    # Then sync Notion changes back to GitHub
-    sync_notion_to_github()
+    asyncio.run(run_bidirectional())
 
 
 if __name__ == "__main__":
-    import sys
-
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     if len(sys.argv) > 1 and sys.argv[1] == "--bidirectional":
         main_bidirectional()
     else:
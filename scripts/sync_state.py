@@ -0,0 +1,52 @@
+"""
+Per-repo "last successful sync" timestamps, persisted in .last_sync.json.
+
+Used to ask GitHub only for issues updated since the previous run and to skip
+Notion writes for issues that have not changed since they were last synced.
+Keys are "owner/repo" for GitHub → Notion and "notion:owner/repo" for the
+Notion → GitHub pass, which only queries pages edited since its checkpoint.
+"""
+
+import os
+from datetime import datetime, timezone
+
+import orjson
+
+STATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".last_sync.json")
+
+_state = None
+
+
+def now_iso() -> str:
+    """Current UTC time in the ISO 8601 form GitHub's `since` expects."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def now_iso_minute() -> str:
+    """Current UTC time rounded down to the minute (the precision of Notion's last_edited_time)."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:00Z")
+
+
+def parse_iso(value: str) -> datetime:
+    """Parse a GitHub or Notion ISO 8601 timestamp."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def load() -> dict:
+    """Load the state from disk (once per process) and return it."""
+    global _state
+    if _state is None:
+        try:
+            with open(STATE_PATH, "rb") as f:
+                _state = orjson.loads(f.read())
+        except (OSError, ValueError):
+            _state = {}
+    return _state
+
+
+def save():
+    """Write the state back to disk if it was loaded."""
+    if _state is None:
+        return
+    with open(STATE_PATH, "wb") as f:
+        f.write(orjson.dumps(_state, option=orjson.OPT_INDENT_2))
@@ -0,0 +1,60 @@
+"""
+Small in-memory LRU cache with per-entry expiry.
+
+Used to remember Notion page and GitHub issue lookups for a short time so the
+same issue is not fetched repeatedly within a run. Writers call invalidate()
+after changing the underlying object so later reads go back to the API.
+"""
+
+import time
+from collections import OrderedDict
+
+# Returned by get() on a miss, so cached None values ("no such page") still count as hits
+MISSING = object()
+
+
+class TTLCache:
+    """LRU cache holding at most `maxsize` entries, each valid for `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key, default=MISSING):
+        """Return the cached value for `key`, or `default` if absent or expired."""
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return default
+
+    def set(self, key, value):
+        """Store `value` under `key`, evicting the least recently used entries when full."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        """Drop `key` so the next get() misses."""
+        self._data.pop(key, None)
+
+    def clear(self):
+        """Drop every entry and reset the hit/miss counters."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> str:
+        """One-line hit/miss summary."""
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"{self.hits} hits / {self.misses} misses ({rate:.0%} hit rate)"